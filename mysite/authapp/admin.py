@@ -5,16 +5,21 @@ from .models import UserProfile, Cart, CartItem
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'fullName', 'phone', 'email', 'city', 'address')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'user__email', 'fullName', 'phone', 'email', 'city', 'address')
 
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product', 'cart__user')
+
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
     list_display = ('user',)
+    list_select_related = ('user',)
     search_fields = ('user__username', 'user__email')
     inlines = [CartItemInline]
 
@@ -22,4 +27,5 @@ class CartAdmin(admin.ModelAdmin):
 @admin.register(CartItem)
 class CartItemAdmin(admin.ModelAdmin):
     list_display = ('cart', 'product', 'count')
+    list_select_related = ('cart__user', 'product')
     search_fields = ('cart__user__username', 'cart__user__email', 'product__title')
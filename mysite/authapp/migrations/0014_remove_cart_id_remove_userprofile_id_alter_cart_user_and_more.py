@@ -0,0 +1,62 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def point_cart_items_to_user_id(apps, schema_editor):
+    Cart = apps.get_model('authapp', 'Cart')
+    CartItem = apps.get_model('authapp', 'CartItem')
+    CartItem.objects.update(
+        cart_id=Subquery(Cart.objects.filter(id=OuterRef('cart_id')).values('user_id')[:1]),
+    )
+
+
+def point_cart_items_to_cart_id(apps, schema_editor):
+    Cart = apps.get_model('authapp', 'Cart')
+    CartItem = apps.get_model('authapp', 'CartItem')
+    CartItem.objects.update(
+        cart_id=Subquery(Cart.objects.filter(user_id=OuterRef('cart_id')).values('id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('authapp', '0013_delete_userorder'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cartitem',
+            name='cart',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='authapp.cart'),
+        ),
+        migrations.RunPython(point_cart_items_to_user_id, point_cart_items_to_cart_id),
+        migrations.RemoveField(
+            model_name='cart',
+            name='id',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='id',
+        ),
+        migrations.AlterField(
+            model_name='cart',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cart', serialize=False, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile', serialize=False, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='cartitem',
+            name='cart',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='authapp.cart'),
+        ),
+    ]
@@ -9,6 +9,8 @@
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from shopapp.models import Product, Order
 
 
@@ -17,7 +19,7 @@ class Cart(models.Model):
     Модель Cart представляет корзину пользователя с полем count для каждого товара.
     """
 
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart', primary_key=True)
 
 
 class CartItem(models.Model):
@@ -35,7 +37,7 @@ class UserProfile(models.Model):
     Модель UserProfile представляет профиль пользователя.
     """
 
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile', primary_key=True)
     fullName = models.CharField(max_length=255, null=True, blank=True)
     phone = models.CharField(max_length=15, null=True, blank=True)
     email = models.EmailField(null=True, blank=True)
@@ -44,3 +46,10 @@ class UserProfile(models.Model):
     address = models.CharField(max_length=255, null=True, blank=True)
 
 
+@receiver(post_save, sender=User)
+def ensure_profile(sender, instance, created, **kwargs):
+    """
+    Создает профиль для нового пользователя, как бы он ни был создан.
+    """
+    if created:
+        UserProfile.objects.create(user=instance, fullName=instance.get_full_name() or None)
@@ -0,0 +1,16 @@
+"""
+Модуль parsers содержит парсеры тела запроса, используемые представлениями authapp.
+"""
+
+from rest_framework.parsers import JSONParser
+
+
+class FormEncodedJSONParser(JSONParser):
+    """
+    Парсер для JSON-документа, отправленного с заголовком application/x-www-form-urlencoded.
+
+    Фронтенд передает данные входа и регистрации строкой JSON без указания типа содержимого,
+    поэтому тело запроса разбирается как JSON целиком.
+    """
+
+    media_type = 'application/x-www-form-urlencoded'
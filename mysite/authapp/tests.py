@@ -1,3 +1,59 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from .models import UserProfile
+
+
+class SignUpViewTest(APITestCase):
+    def test_sign_up_with_form_encoded_json(self):
+        payload = json.dumps({'name': 'Иван', 'username': 'ivan', 'password': 'secret-pass'})
+        response = self.client.post('/api/sign-up', payload, content_type='application/x-www-form-urlencoded')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('token', response.data)
+        user = User.objects.get(username='ivan')
+        self.assertEqual(user.first_name, 'Иван')
+        self.assertEqual(UserProfile.objects.get(user=user).fullName, 'Иван')
+
+    def test_sign_up_with_taken_username(self):
+        User.objects.create_user(username='ivan', password='secret-pass')
+        payload = {'name': 'Иван', 'username': 'ivan', 'password': 'secret-pass'}
+        response = self.client.post('/api/sign-up', payload, format='json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(User.objects.filter(username='ivan').count(), 1)
+
+
+class SignInViewTest(APITestCase):
+    def setUp(self):
+        User.objects.create_user(username='ivan', password='secret-pass')
+
+    def test_sign_in_with_json(self):
+        response = self.client.post('/api/sign-in', {'username': 'ivan', 'password': 'secret-pass'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('token', response.data)
+
+    def test_sign_in_with_wrong_password(self):
+        response = self.client.post('/api/sign-in', {'username': 'ivan', 'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class ProfileViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ivan', password='secret-pass', first_name='Иван')
+        self.client.force_login(self.user)
+
+    def test_get_profile(self):
+        response = self.client.get('/api/profile')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['fullName'], 'Иван')
+
+    def test_update_invalidates_cached_profile(self):
+        self.client.get('/api/profile')
+        response = self.client.post('/api/profile', {'fullName': 'Иван Петров', 'city': 'Москва'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/profile')
+        self.assertEqual(response.data['fullName'], 'Иван Петров')
+        self.assertEqual(response.data['city'], 'Москва')
@@ -15,19 +15,41 @@ HTTP-запросов, связанных с взаимодействием с 
 
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
-import json
-import os
 
 from .models import UserProfile
+from .parsers import FormEncodedJSONParser
 from .serializers import UserProfileSerializer
 
 
+PROFILE_CACHE_TIMEOUT = 60
+
+
+def _profile_cache_key(user_id):
+    """
+    Возвращает ключ кэша с сериализованным профилем пользователя.
+    """
+    return f'profile:{user_id}'
+
+
+def _get_profile(request):
+    """
+    Возвращает профиль текущего пользователя, кэшируя его на объекте запроса.
+    """
+    profile = getattr(request, '_cached_profile', None)
+    if profile is None:
+        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        request._cached_profile = profile
+    return profile
+
+
 class AvatarView(APIView):
     """
     Класс AvatarView представляет API для загрузки и обновления аватара пользователя.
@@ -44,9 +66,10 @@ class AvatarView(APIView):
     def post(self, request, format=None):
         avatar = request.FILES.get('avatar')
         if avatar:
-            user_profile = UserProfile.objects.get(user=request.user)
+            user_profile = _get_profile(request)
             user_profile.avatar = request.FILES['avatar']
-            user_profile.save()
+            user_profile.save(update_fields=['avatar'])
+            cache.delete(_profile_cache_key(request.user.id))
             serializer = UserProfileSerializer(user_profile)
             return Response(serializer.data)
         else:
@@ -80,8 +103,8 @@ class ChangePasswordView(APIView):
 
         if user.check_password(current_password):
             user.set_password(new_password)
-            user.save()
-            Token.objects.filter(user=user).delete()
+            user.save(update_fields=['password'])
+            Token.objects.filter(user_id=user.pk).delete()
             return Response({'success': 'Пароль успешно изменен'}, status=200)
         else:
             return Response({'error': 'Неверный текущий пароль'}, status=400)
@@ -105,12 +128,15 @@ class ProfileView(APIView):
     parser_classes = [JSONParser, FormParser, MultiPartParser]
 
     def get(self, request, format=None):
-        user_profile = UserProfile.objects.get(user=request.user)
-        serializer = UserProfileSerializer(user_profile)
-        return Response(serializer.data)
+        data = cache.get_or_set(
+            _profile_cache_key(request.user.id),
+            lambda: UserProfileSerializer(_get_profile(request)).data,
+            PROFILE_CACHE_TIMEOUT,
+        )
+        return Response(data)
 
     def post(self, request, format=None):
-        user_profile = UserProfile.objects.get(user=request.user)
+        user_profile = _get_profile(request)
         data = request.data.copy()
         avatar = data.get('avatar')
 
@@ -118,13 +144,12 @@ class ProfileView(APIView):
             del data['avatar']
         else:
             if user_profile.avatar:
-                avatar_path = user_profile.avatar.path
-                if os.path.exists(avatar_path):
-                    os.remove(avatar_path)
+                user_profile.avatar.delete(save=False)
 
         serializer = UserProfileSerializer(user_profile, data=data)
         if serializer.is_valid():
             serializer.save()
+            cache.delete(_profile_cache_key(request.user.id))
             return Response(serializer.data)
         else:
             return Response(serializer.errors, status=400)
@@ -142,14 +167,11 @@ class SignInView(APIView):
 
     """
 
-    parser_classes = [FormParser]
+    parser_classes = [JSONParser, FormEncodedJSONParser]
 
     def post(self, request, format=None):
-        json_data = list(request.data.keys())[0]
-        data = json.loads(json_data)
-
-        username = data.get('username')
-        password = data.get('password')
+        username = request.data.get('username')
+        password = request.data.get('password')
         user = authenticate(request, username=username, password=password)
         if user is not None:
             login(request, user)
@@ -173,7 +195,7 @@ class SignOutView(APIView):
     def post(self, request, format=None):
         user = request.user
         if user.is_authenticated:
-            Token.objects.filter(user=user).delete()
+            Token.objects.filter(user_id=user.pk).delete()
             logout(request)
             return Response({'detail': 'Вы успешно вышли из аккаунта'})
         else:
@@ -192,29 +214,23 @@ class SignUpView(APIView):
 
     """
 
-    parser_classes = [FormParser]
+    parser_classes = [JSONParser, FormEncodedJSONParser]
 
     def post(self, request, format=None):
-        json_data = list(request.data.keys())[0]
-        data = json.loads(json_data)
-
-        name = data.get('name')
-        username = data.get('username')
-        password = data.get('password')
+        name = request.data.get('name')
+        username = request.data.get('username')
+        password = request.data.get('password')
 
         if not name or not username or not password:
             return Response({'error': 'Все поля должны быть заполнены'}, status=400)
 
         try:
-            user = User.objects.create_user(username=username, password=password)
-            user.first_name = name
-            user.save()
-
-            profile = UserProfile(user=user, fullName=name)
-            profile.save()
-
-            token, _ = Token.objects.get_or_create(user=user)
-
-            return Response({'success': 'Аккаунт успешно зарегистрирован', 'token': token.key}, status=201)
-        except Exception as e:
+            with transaction.atomic():
+                user = User(username=username, first_name=name)
+                user.set_password(password)
+                user.save()
+                token = Token.objects.create(user=user)
+        except IntegrityError:
             return Response({'error': 'Ошибка при регистрации аккаунта'}, status=500)
+
+        return Response({'success': 'Аккаунт успешно зарегистрирован', 'token': token.key}, status=201)
@@ -1,15 +1,48 @@
 from django.contrib import admin
+from django.db import NotSupportedError
+from django.db.models import CharField, Func
 from .models import Category, Product, ProductImage, Review, Order, Tag, ProductCharacteristic, Discount, OrderStatus, \
     PaymentType, DeliveryType
 
 
+class MinuteDateTimeString(Func):
+    """
+    Форматирует дату и время в строку 'YYYY-MM-DD HH:MM' на стороне базы данных.
+
+    Поддерживаются SQLite и PostgreSQL, для остальных баз данных выбрасывается NotSupportedError.
+    """
+
+    output_field = CharField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f'MinuteDateTimeString is not supported on {connection.vendor}.')
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, function='STRFTIME',
+            template="%(function)s('%%%%Y-%%%%m-%%%%d %%%%H:%%%%M', %(expressions)s)", **extra_context
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, function='TO_CHAR',
+            template="%(function)s(%(expressions)s, 'YYYY-MM-DD HH24:MI')", **extra_context
+        )
+
+
 class ProductImageInline(admin.TabularInline):
     model = ProductImage
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
 
 class ReviewInline(admin.TabularInline):
     model = Review
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -21,14 +54,16 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('title', 'price', 'category', 'available', 'popular', 'limited', 'banner')
+    list_select_related = ('category',)
     list_filter = ('category', 'available', 'popular', 'limited', 'banner')
-    search_fields = ('title', 'description')
+    search_fields = ('^title',)
     inlines = [ProductImageInline, ReviewInline]
 
 
 @admin.register(ProductCharacteristic)
 class ProductCharacteristicAdmin(admin.ModelAdmin):
     list_display = ('product', 'name', 'value')
+    list_select_related = ('product',)
     list_filter = ('product',)
     search_fields = ('product__title', 'name')
 
@@ -36,17 +71,26 @@ class ProductCharacteristicAdmin(admin.ModelAdmin):
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('product', 'author', 'rate', 'date')
+    list_select_related = ('product',)
     list_filter = ('product', 'rate')
     search_fields = ('product__title', 'author')
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('user', 'status', 'deliveryType', 'paymentType', 'totalCost', 'formatted_created_at')
+    list_display = ('user', 'status', 'deliveryType', 'paymentType', 'totalCost', 'created_str')
+    list_select_related = ('user', 'status', 'deliveryType', 'paymentType')
     list_filter = ('status', 'deliveryType', 'paymentType')
-    search_fields = ('user__username', 'user__email')
+    search_fields = ('=user__username', '=user__email')
     readonly_fields = ('formatted_created_at',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(created_str=MinuteDateTimeString('createdAt'))
+
+    @admin.display(description='Created at', ordering='createdAt')
+    def created_str(self, obj):
+        return obj.created_str
+
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -57,6 +101,7 @@ class TagAdmin(admin.ModelAdmin):
 @admin.register(Discount)
 class DiscountAdmin(admin.ModelAdmin):
     list_display = ('product', 'salePrice', 'dateFrom', 'dateTo')
+    list_select_related = ('product',)
     list_filter = ('dateFrom', 'dateTo')
     search_fields = ('product__title',)
 
@@ -0,0 +1,90 @@
+"""
+Модуль filters содержит фильтры и сортировку каталога продуктов.
+"""
+
+from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Product
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """
+    Фильтр по списку чисел, переданных через запятую.
+    """
+
+
+class ProductFilter(filters.FilterSet):
+    """
+    Набор фильтров каталога продуктов.
+
+    Фронтенд передает параметры в виде filter[name] и tags[], поэтому перед фильтрацией
+    они приводятся к именам фильтров. Несуществующие теги не считаются ошибкой и просто
+    не находят продуктов, а нечисловые значения фильтров приводят к ответу 400.
+    """
+
+    name = filters.CharFilter(field_name='title', lookup_expr='icontains')
+    minPrice = filters.NumberFilter(field_name='price', lookup_expr='gte')
+    maxPrice = filters.NumberFilter(field_name='price', lookup_expr='lte')
+    freeDelivery = filters.BooleanFilter(method='filter_free_delivery')
+    available = filters.BooleanFilter(field_name='available')
+    tags = NumberInFilter(field_name='tags', lookup_expr='in', distinct=True)
+
+    class Meta:
+        model = Product
+        fields = ['name', 'minPrice', 'maxPrice', 'freeDelivery', 'available', 'tags']
+
+    def __init__(self, data=None, *args, **kwargs):
+        if data is not None:
+            data = data.copy()
+            for key in list(data.keys()):
+                if key.startswith('filter[') and key.endswith(']'):
+                    data.setlist(key[len('filter['):-1], data.getlist(key))
+                elif key == 'tags[]':
+                    data['tags'] = ','.join(data.getlist(key))
+        super().__init__(data, *args, **kwargs)
+
+    def filter_free_delivery(self, queryset, name, value):
+        """
+        Оставляет только продукты с бесплатной доставкой, если фильтр включен.
+        """
+        if value:
+            return queryset.filter(freeDelivery=True)
+        return queryset
+
+
+class CatalogOrderingFilter(BaseFilterBackend):
+    """
+    Сортировка каталога по параметрам sort и sortType.
+
+    Поля сортировки фронтенда сопоставляются с полями модели, неизвестные поля игнорируются.
+    """
+
+    sort_fields = {
+        'rating': 'rating_x10',
+        'price': 'price',
+        'reviews': 'reviews_count',
+        'date': 'date',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        sort_param = request.query_params.get('sort')
+        if not sort_param:
+            return queryset
+
+        sort_fields = [sort_field.strip() for sort_field in sort_param.split(',')]
+        sort_types = [sort_type.strip() for sort_type in request.query_params.get('sortType', '').split(',')]
+        ordering = []
+
+        for field, sort_type in zip(sort_fields, sort_types):
+            model_field = self.sort_fields.get(field)
+            if model_field is None:
+                continue
+            if sort_type == 'dec':
+                ordering.append(model_field)
+            elif sort_type == 'inc':
+                ordering.append('-' + model_field)
+
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
@@ -0,0 +1,70 @@
+"""
+Модуль lookups содержит функции для получения справочных записей заказа: способов доставки,
+способов оплаты и статусов заказа.
+
+Справочники меняются редко, поэтому записи кэшируются по первичному ключу и сбрасываются
+из кэша при изменении или удалении.
+"""
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.shortcuts import get_object_or_404
+
+from .models import DeliveryType, OrderStatus, PaymentType
+
+
+LOOKUP_CACHE_TIMEOUT = 60 * 5
+
+
+def _lookup_cache_key(model, pk):
+    """
+    Возвращает ключ кэша для справочной записи.
+    """
+    return f'lookup:{model._meta.label_lower}:{pk}'
+
+
+def _get_lookup(model, pk):
+    """
+    Возвращает справочную запись из кэша, загружая ее из базы данных при отсутствии в кэше.
+    """
+    key = _lookup_cache_key(model, pk)
+    instance = cache.get(key)
+    if instance is None:
+        instance = get_object_or_404(model, pk=pk)
+        cache.set(key, instance, LOOKUP_CACHE_TIMEOUT)
+    return instance
+
+
+def get_delivery(pk):
+    """
+    Возвращает способ доставки с указанным первичным ключом.
+    """
+    return _get_lookup(DeliveryType, pk)
+
+
+def get_payment(pk):
+    """
+    Возвращает способ оплаты с указанным первичным ключом.
+    """
+    return _get_lookup(PaymentType, pk)
+
+
+def get_status(pk):
+    """
+    Возвращает статус заказа с указанным первичным ключом.
+    """
+    return _get_lookup(OrderStatus, pk)
+
+
+@receiver(post_save, sender=DeliveryType)
+@receiver(post_save, sender=PaymentType)
+@receiver(post_save, sender=OrderStatus)
+@receiver(post_delete, sender=DeliveryType)
+@receiver(post_delete, sender=PaymentType)
+@receiver(post_delete, sender=OrderStatus)
+def invalidate_lookup(sender, instance, **kwargs):
+    """
+    Сбрасывает закэшированную справочную запись при ее изменении или удалении.
+    """
+    cache.delete(_lookup_cache_key(sender, instance.pk))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0064_alter_order_createdat_alter_product_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='fullDescription',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0065_alter_product_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'available', 'popular'], name='prod_cat_avail_pop_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['banner'], name='prod_banner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['limited'], name='prod_limited_idx'),
+        ),
+    ]
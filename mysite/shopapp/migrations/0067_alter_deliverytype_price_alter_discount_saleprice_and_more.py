@@ -0,0 +1,34 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:23
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0066_product_prod_cat_avail_pop_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deliverytype',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='discount',
+            name='salePrice',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='totalCost',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=12),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0067_alter_deliverytype_price_alter_discount_saleprice_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='rate',
+            field=models.IntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5')]),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.CheckConstraint(check=models.Q(('rate__gte', 1), ('rate__lte', 5)), name='review_rate_range'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:28
+
+from django.db import migrations, models
+from django.db.models import Avg, F, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce, Round
+
+
+def fill_rating_x10(apps, schema_editor):
+    Product = apps.get_model('shopapp', 'Product')
+    Review = apps.get_model('shopapp', 'Review')
+    reviews = Review.objects.filter(product=OuterRef('pk')).values('product')
+    avg_rating = Subquery(reviews.annotate(avg_rating=Avg('rate')).values('avg_rating'))
+    Product.objects.update(
+        rating_x10=Coalesce(Cast(Round(avg_rating * 10), models.SmallIntegerField()), 0),
+    )
+
+
+def copy_rating_x10_to_rating(apps, schema_editor):
+    Product = apps.get_model('shopapp', 'Product')
+    Product.objects.update(rating=F('rating_x10') / 10.0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0068_alter_review_rate_review_review_rate_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_x10',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_x10, copy_rating_x10_to_rating),
+        migrations.RemoveField(
+            model_name='product',
+            name='rating',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:30
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce, Round
+
+
+def sync_product_review_stats(apps, schema_editor):
+    Product = apps.get_model('shopapp', 'Product')
+    Review = apps.get_model('shopapp', 'Review')
+    reviews = Review.objects.filter(product=OuterRef('pk')).values('product')
+    avg_rating = Subquery(reviews.annotate(avg_rating=Avg('rate')).values('avg_rating'))
+    Product.objects.update(
+        reviews_count=Coalesce(Subquery(reviews.annotate(count=Count('id')).values('count')), 0),
+        rating_x10=Coalesce(Cast(Round(avg_rating * 10), models.SmallIntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0069_remove_product_rating_product_rating_x10'),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_product_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.1 on 2026-10-15 04:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0070_sync_product_review_stats'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='OrderProduct',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shopapp.order')),
+                        ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shopapp.product')),
+                    ],
+                    options={
+                        'db_table': 'shopapp_order_products',
+                        'unique_together': {('order', 'product')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='order',
+                    name='products',
+                    field=models.ManyToManyField(related_name='product_orders', through='shopapp.OrderProduct', to='shopapp.product'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='orderproduct',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
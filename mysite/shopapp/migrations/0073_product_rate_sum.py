@@ -0,0 +1,35 @@
+# Generated by Django 4.2.1 on 2026-10-15 05:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+
+def fill_rate_sum(apps, schema_editor):
+    Product = apps.get_model('shopapp', 'Product')
+    Review = apps.get_model('shopapp', 'Review')
+    reviews = Review.objects.filter(product=OuterRef('pk')).order_by().values('product')
+    reviews_count = Coalesce(Subquery(reviews.annotate(count=Count('id')).values('count')), 0)
+    rate_sum = Coalesce(Subquery(reviews.annotate(rate_sum=Sum('rate')).values('rate_sum')), 0)
+    avg_rating_x10 = Cast(rate_sum, models.FloatField()) * 10 / NullIf(reviews_count, 0)
+    Product.objects.update(
+        reviews_count=reviews_count,
+        rate_sum=rate_sum,
+        rating_x10=Coalesce(Cast(Round(avg_rating_x10), models.SmallIntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopapp', '0072_product_prod_price_idx_product_prod_free_avail_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rate_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rate_sum, migrations.RunPython.noop),
+    ]
@@ -14,17 +14,27 @@
 - DeliveryType: представляет способы доставки в интернет-магазине.
 - PaymentType: представляет способы оплаты в интернет-магазине.
 - Order: представляет заказы, созданные в интернет-магазине.
+- OrderProduct: представляет товары в заказе с их количеством.
 """
 
-from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models import Avg
-from django.db.models.signals import post_save
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 
+RATING_CHOICES = tuple((i, str(i)) for i in range(1, 6))
+
+CATEGORIES_CACHE_KEY = 'categories:v1'
+TAGS_CACHE_KEY = 'tags:v1'
+
+
 def product_preview_directory_path(instance: "Product", filename: str):
     """
     Возвращает путь для загрузки предварительного просмотра продукта.
@@ -63,6 +73,15 @@ class Tag(models.Model):
     name = models.CharField(max_length=100)
 
 
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags_cache(sender, **kwargs):
+    """
+    Сбрасывает закэшированный список тегов при изменении или удалении тега.
+    """
+    cache.delete(TAGS_CACHE_KEY)
+
+
 class Category(models.Model):
     """
     Модель Category представляет категорию товаров в интернет-магазине.
@@ -75,15 +94,25 @@ class Category(models.Model):
     is_parent = models.BooleanField(default=False)
 
 
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Category.parent.through)
+def invalidate_categories_cache(sender, **kwargs):
+    """
+    Сбрасывает закэшированное дерево категорий при изменении категорий или связей между ними.
+    """
+    cache.delete(CATEGORIES_CACHE_KEY)
+
+
 class Product(models.Model):
     """
     Модель Product представляет товар, который можно продавать в интернет-магазине.
     """
 
     title = models.CharField(max_length=100, db_index=True)
-    description = models.TextField(null=False, blank=True, db_index=True)
-    fullDescription = models.TextField(null=False, blank=True, db_index=True)
-    price = models.FloatField(default=0)
+    description = models.TextField(null=False, blank=True)
+    fullDescription = models.TextField(null=False, blank=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'))
     date = models.DateTimeField(default=timezone.now)
     archived = models.BooleanField(default=False)
     preview = models.ImageField(null=True, blank=True, upload_to=product_preview_directory_path)
@@ -92,30 +121,35 @@ class Product(models.Model):
     available = models.BooleanField(default=True)
     tags = models.ManyToManyField(Tag, related_name="products")
     count = models.PositiveIntegerField(default=0)
-    rating = models.FloatField(null=True, blank=True, default=0)
+    rating_x10 = models.SmallIntegerField(default=0)
     reviews_count = models.PositiveIntegerField(default=0)
+    rate_sum = models.PositiveIntegerField(default=0)
     popular = models.BooleanField(default=False)
     limited = models.BooleanField(default=False)
     banner = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'available', 'popular'], name='prod_cat_avail_pop_idx'),
+            models.Index(fields=['banner'], name='prod_banner_idx'),
+            models.Index(fields=['limited'], name='prod_limited_idx'),
+            models.Index(fields=['price'], name='prod_price_idx'),
+            models.Index(fields=['freeDelivery', 'available'], name='prod_free_avail_idx'),
+            models.Index(fields=['date'], name='prod_date_idx'),
+        ]
+
     def formatted_created_at(self):
         """
         Возвращает дату и время создания товара в формате 'YYYY-MM-DD HH:MM'.
         """
         return self.date.strftime('%Y-%m-%d %H:%M')
 
-    def calculate_reviews_count(self):
-        """
-        Вычисляет общее количество отзывов о товаре.
-        """
-        return self.reviews.count()
-
-    def average_rating(self):
+    @property
+    def rating(self):
         """
-        Вычисляет среднюю оценку товара на основе отзывов.
+        Возвращает средний рейтинг товара с точностью до одного знака после запятой.
         """
-        avg_rating = self.reviews.aggregate(avg_rating=Avg('rate')).get('avg_rating')
-        return avg_rating
+        return self.rating_x10 / 10
 
 
 class Discount(models.Model):
@@ -124,25 +158,101 @@ class Discount(models.Model):
     """
 
     product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True)
-    salePrice = models.FloatField()
+    salePrice = models.DecimalField(max_digits=12, decimal_places=2)
     dateFrom = models.DateField()
     dateTo = models.DateField()
 
 
+def _rating_x10(rate_sum, reviews_count):
+    """
+    Возвращает выражение для среднего рейтинга товара, умноженного на 10 и округленного до целого.
+    """
+    avg_rating_x10 = Cast(rate_sum, models.FloatField()) * 10 / NullIf(reviews_count, 0)
+    return Coalesce(Cast(Round(avg_rating_x10), models.SmallIntegerField()), 0)
+
+
+def add_review_stats(product_id, reviews_count, rate_sum):
+    """
+    Добавляет к количеству отзывов и сумме оценок товара указанные значения и пересчитывает рейтинг.
+
+    Для исключения отзывов значения передаются отрицательными. Обновление выполняется одним запросом
+    без обращения к таблице отзывов.
+    """
+    new_reviews_count = F('reviews_count') + reviews_count
+    new_rate_sum = F('rate_sum') + rate_sum
+    Product.objects.filter(pk=product_id).update(
+        reviews_count=new_reviews_count,
+        rate_sum=new_rate_sum,
+        rating_x10=_rating_x10(new_rate_sum, new_reviews_count),
+    )
+
+
+def recount_review_stats(products):
+    """
+    Пересчитывает количество отзывов, сумму оценок и рейтинг товаров по таблице отзывов.
+    """
+    reviews = Review.objects.filter(product=OuterRef('pk')).order_by().values('product')
+    reviews_count = Coalesce(Subquery(reviews.annotate(count=Count('id')).values('count')), 0)
+    rate_sum = Coalesce(Subquery(reviews.annotate(rate_sum=Sum('rate')).values('rate_sum')), 0)
+    products.update(
+        reviews_count=reviews_count,
+        rate_sum=rate_sum,
+        rating_x10=_rating_x10(rate_sum, reviews_count),
+    )
+
+
+class ReviewQuerySet(models.QuerySet):
+    """
+    QuerySet отзывов, который при удалении исключает отзывы из статистики товаров.
+    """
+
+    def delete(self):
+        """
+        Удаляет отзывы и вычитает их из количества отзывов и суммы оценок товаров.
+        """
+        with transaction.atomic():
+            stats = list(self.order_by().values('product_id').annotate(count=Count('id'), rate_sum=Sum('rate')))
+            result = super().delete()
+            for row in stats:
+                add_review_stats(row['product_id'], -row['count'], -row['rate_sum'])
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Review(models.Model):
     """
     Модель Review представляет отзывы пользователей о продуктах в интернет-магазине.
-    """
 
-    RATING_CHOICES = [(i, str(i)) for i in range(1, 6)]
+    Количество отзывов, сумма оценок и рейтинг товара обновляются при сохранении и удалении отзыва.
+    Удаление обрабатывается в delete(), а не в сигнале post_delete, чтобы при удалении товара
+    его отзывы удалялись одним запросом.
+    """
 
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reviews")
     author = models.CharField(max_length=100)
     text = models.TextField()
-    rate = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    rate = models.IntegerField(choices=RATING_CHOICES)
     date = models.DateTimeField(default=timezone.now)
     email = models.EmailField(null=True, blank=True)
 
+    objects = ReviewQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(check=Q(rate__gte=1, rate__lte=5), name='review_rate_range'),
+        ]
+
+    def delete(self, *args, **kwargs):
+        """
+        Удаляет отзыв и вычитает его из количества отзывов и суммы оценок товара.
+        """
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            add_review_stats(self.product_id, -1, -self.rate)
+        return result
+
     def formatted_created_at(self):
         """
         Возвращает дату и время создания отзыва в формате 'YYYY-MM-DD HH:MM'.
@@ -151,11 +261,21 @@ class Review(models.Model):
 
 
 @receiver(post_save, sender=Review)
-def update_product_fields(sender, instance, **kwargs):
-    product = instance.product
-    product.reviews_count = product.calculate_reviews_count()
-    product.rating = product.average_rating()
-    product.save()
+def update_product_fields(sender, instance, created, **kwargs):
+    """
+    Обновляет количество отзывов, сумму оценок и средний рейтинг товара при сохранении отзыва.
+
+    Новый отзыв добавляется к статистике товара инкрементально. При изменении отзыва прежняя оценка
+    неизвестна, поэтому статистика товара пересчитывается.
+
+    При загрузке фикстур (raw) статистика уже хранится в строке товара и не изменяется.
+    """
+    if kwargs.get('raw'):
+        return
+    if created:
+        add_review_stats(instance.product_id, 1, instance.rate)
+    else:
+        recount_review_stats(Product.objects.filter(pk=instance.product_id))
 
 
 class ProductCharacteristic(models.Model):
@@ -198,7 +318,7 @@ class DeliveryType(models.Model):
     """
 
     name = models.CharField(max_length=100)
-    price = models.FloatField(default=0)
+    price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'))
 
     def __str__(self):
         """
@@ -228,11 +348,11 @@ class Order(models.Model):
 
     createdAt = models.DateTimeField(default=timezone.now)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_orders')
-    products = models.ManyToManyField(Product, related_name="product_orders")
+    products = models.ManyToManyField(Product, related_name="product_orders", through='OrderProduct')
     status = models.ForeignKey(OrderStatus, on_delete=models.PROTECT, null=True)
     deliveryType = models.ForeignKey(DeliveryType, on_delete=models.PROTECT, null=True)
     paymentType = models.ForeignKey(PaymentType, on_delete=models.PROTECT, null=True)
-    totalCost = models.FloatField(default=0)
+    totalCost = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'))
 
     class Meta:
         ordering = ['-createdAt']
@@ -242,3 +362,17 @@ class Order(models.Model):
         Возвращает дату и время создания заказа в формате 'YYYY-MM-DD HH:MM'.
         """
         return self.createdAt.strftime('%Y-%m-%d %H:%M')
+
+
+class OrderProduct(models.Model):
+    """
+    Модель OrderProduct представляет товар в заказе с его количеством.
+    """
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'shopapp_order_products'
+        unique_together = [('order', 'product')]
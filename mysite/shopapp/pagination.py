@@ -0,0 +1,38 @@
+"""
+Модуль pagination содержит классы пагинации для списков, которые фронтенд
+запрашивает постранично.
+"""
+
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+class CurrentPagePagination(PageNumberPagination):
+    """
+    Пагинация по параметру currentPage.
+
+    Ответ оборачивается в объект с полями items, currentPage и lastPage. Номер страницы
+    вне допустимого диапазона приводится к ближайшей существующей странице.
+    """
+
+    page_size = 10
+    page_query_param = 'currentPage'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Возвращает объекты запрошенной страницы.
+        """
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        self.page = paginator.get_page(request.query_params.get(self.page_query_param))
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        """
+        Возвращает ответ с объектами страницы и номерами текущей и последней страниц.
+        """
+        return Response({
+            'items': data,
+            'currentPage': self.page.number,
+            'lastPage': self.page.paginator.num_pages,
+        })
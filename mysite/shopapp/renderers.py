@@ -0,0 +1,30 @@
+"""
+Модуль renderers содержит рендереры ответов API.
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Рендерер JSON на основе orjson.
+
+    Типы, которые orjson не сериализует сам (Decimal, ленивые строки перевода и т.п.),
+    преобразуются так же, как в стандартном JSONRenderer.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Сериализует данные ответа в JSON.
+        """
+        if data is None:
+            return b''
+
+        option = orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.encoder.default, option=option)
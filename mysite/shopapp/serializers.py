@@ -1,7 +1,30 @@
+from collections import defaultdict
+
+from django.db import transaction
 from rest_framework import serializers
 from .models import Product, Category, Review, Tag, ProductCharacteristic, Discount
-from authapp.models import CartItem, Cart
-from .models import Order
+from .models import Order, OrderProduct
+
+
+PLACEHOLDER_IMAGE = {'src': '/media/Отсутствие.png', 'alt': 'Изображение отсутствует'}
+PLACEHOLDER_IMAGES = [PLACEHOLDER_IMAGE]
+
+
+def get_preview_images(obj, product):
+    """
+    Возвращает список изображений продукта для ответа API.
+
+    Если queryset аннотирован путем к превью (preview_path), используется он, иначе путь
+    строится по полю preview продукта.
+    """
+    if hasattr(obj, 'preview_path'):
+        src = obj.preview_path
+    else:
+        preview = str(product.preview)
+        src = "/media/" + preview if preview else None
+    if src:
+        return [{'src': src, 'alt': 'Preview Image'}]
+    return PLACEHOLDER_IMAGES
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -19,20 +42,20 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'image', 'subcategories')
 
     def get_image(self, obj):
-        if obj.image:
-            src = obj.image.url
-            alt = obj.description
-        else:
-            src = "/media/Отсутствие.png"
-            alt = "Изображение отсутствует"
+        if not obj.image:
+            return PLACEHOLDER_IMAGE
         return {
-            'src': src,
-            'alt': alt
+            'src': obj.image.url,
+            'alt': obj.description
         }
 
     def get_subcategories(self, obj):
-        subcategories = obj.children.all()
-        serializer = CategorySerializer(subcategories, many=True)
+        children_by_parent = self.context.get('children_by_parent')
+        if children_by_parent is None:
+            subcategories = obj.children.all()
+        else:
+            subcategories = children_by_parent.get(obj.id, [])
+        serializer = CategorySerializer(subcategories, many=True, context=self.context)
         return serializer.data
 
 
@@ -55,21 +78,13 @@ class ProductSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True)
 
     def get_images(self, obj):
-        preview = str(obj.preview)
-        if preview:
-            return [{'src': "/media/" + preview, 'alt': 'Preview Image'}]
-        else:
-            return [{'src': '/media/Отсутствие.png', 'alt': 'Изображение отсутствует'}]
+        return get_preview_images(obj, obj)
 
     def get_reviews(self, obj):
-        return obj.reviews.count()
+        return obj.reviews_count
 
     def get_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews.exists():
-            total_rating = sum(review.rate for review in reviews)
-            return total_rating / reviews.count()
-        return 0
+        return obj.rating
 
     class Meta:
         model = Product
@@ -79,12 +94,6 @@ class ProductSerializer(serializers.ModelSerializer):
         ]
 
 
-class CatalogResponseSerializer(serializers.Serializer):
-    items = ProductSerializer(many=True)
-    currentPage = serializers.IntegerField()
-    lastPage = serializers.IntegerField()
-
-
 class ProductDetailsSerializer(serializers.ModelSerializer):
     images = serializers.SerializerMethodField()
     reviews = ReviewSerializer(many=True)
@@ -93,17 +102,11 @@ class ProductDetailsSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True)
 
     def get_images(self, obj):
-        preview = str(obj.preview)
-        if preview:
-            return [{'src': "/media/" + preview, 'alt': 'Preview Image'}]
-        else:
-            return [{'src': '/media/Отсутствие.png', 'alt': 'Изображение отсутствует'}]
+        return get_preview_images(obj, obj)
 
     def get_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews.exists():
-            total_rating = sum(review.rate for review in reviews)
-            return total_rating / reviews.count()
+        if obj.reviews_count:
+            return obj.rating
         return None
 
     class Meta:
@@ -121,29 +124,23 @@ class DiscountSerializer(serializers.ModelSerializer):
     images = serializers.SerializerMethodField()
 
     def get_images(self, obj):
-        product = obj.product
-        preview = str(product.preview)
-        if preview:
-            return [{'src': "/media/" + preview, 'alt': 'Preview Image'}]
-        else:
-            return [{'src': '/media/Отсутствие.png', 'alt': 'Изображение отсутствует'}]
+        return get_preview_images(obj, obj.product)
 
     class Meta:
         model = Discount
         fields = ['id', 'price', 'salePrice', 'dateFrom', 'dateTo', 'title', 'images']
 
 
-class SaleResponseSerializer(serializers.Serializer):
-    items = DiscountSerializer(many=True)
-    currentPage = serializers.IntegerField()
-    lastPage = serializers.IntegerField()
-
-
 class CartItemSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     count = serializers.IntegerField(min_value=1)
 
 
+class OrderItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    count = serializers.IntegerField(min_value=1, default=1)
+
+
 class CartGETSerializer(serializers.ModelSerializer):
     images = serializers.SerializerMethodField()
     reviews = serializers.SerializerMethodField()
@@ -152,29 +149,16 @@ class CartGETSerializer(serializers.ModelSerializer):
     count = serializers.SerializerMethodField()
 
     def get_images(self, obj):
-        preview = str(obj.preview)
-        if preview:
-            return [{'src': "/media/" + preview, 'alt': 'Preview Image'}]
-        else:
-            return [{'src': '/media/Отсутствие.png', 'alt': 'Изображение отсутствует'}]
+        return get_preview_images(obj, obj)
 
     def get_reviews(self, obj):
-        return obj.reviews.count()
+        return obj.reviews_count
 
     def get_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews.exists():
-            total_rating = sum(review.rate for review in reviews)
-            return total_rating / reviews.count()
-        return 0
+        return obj.rating
 
     def get_count(self, obj):
-        cart = self.context['cart']
-        try:
-            cart_item = cart.items.get(product=obj)
-            return cart_item.count
-        except CartItem.DoesNotExist:
-            return 0
+        return obj.cart_count
 
     class Meta:
         model = Product
@@ -185,17 +169,17 @@ class CartGETSerializer(serializers.ModelSerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    fullName = serializers.SerializerMethodField()
-    email = serializers.SerializerMethodField()
-    phone = serializers.SerializerMethodField()
-    address = serializers.SerializerMethodField()
-    city = serializers.SerializerMethodField()
-    products = ProductSerializer(many=True)
+    fullName = serializers.CharField(source='user.profile.fullName', read_only=True)
+    email = serializers.CharField(source='user.profile.email', read_only=True)
+    phone = serializers.CharField(source='user.profile.phone', read_only=True)
+    address = serializers.CharField(source='user.profile.address', read_only=True)
+    city = serializers.CharField(source='user.profile.city', read_only=True)
+    products = ProductSerializer(many=True, read_only=True)
     deliveryType = serializers.StringRelatedField()
     paymentType = serializers.StringRelatedField()
     status = serializers.StringRelatedField()
 
-    products_data = serializers.ListField(write_only=True)
+    products_data = OrderItemSerializer(many=True, write_only=True)
 
     class Meta:
         model = Order
@@ -204,30 +188,29 @@ class OrderSerializer(serializers.ModelSerializer):
             'city', 'address', 'products', 'products_data',
         ]
 
-    def get_fullName(self, obj):
-        return obj.user.profile.fullName
-
-    def get_email(self, obj):
-        return obj.user.profile.email
-
-    def get_phone(self, obj):
-        return obj.user.profile.phone
+    def validate_products_data(self, value):
+        """
+        Проверяет товары заказа и возвращает пары (товар, количество).
 
-    def get_address(self, obj):
-        return obj.user.profile.address
+        Количества повторяющихся товаров суммируются.
+        """
+        counts = defaultdict(int)
+        for product_data in value:
+            counts[product_data['id']] += product_data['count']
 
-    def get_city(self, obj):
-        return obj.user.profile.city
+        products_by_id = Product.objects.in_bulk(counts)
+        if len(products_by_id) != len(counts):
+            raise serializers.ValidationError('Invalid product ID')
+        return [(products_by_id[product_id], count) for product_id, count in counts.items()]
 
     def create(self, validated_data):
-        products_data = validated_data.pop('products_data', [])
-
-        order = Order.objects.create(**validated_data)
-
-        for product_data in products_data:
-            product = Product.objects.get(id=product_data['id'])
-            count = product_data.get('count', 1)
-
-            order.products.add(product, through_defaults={'count': count})
+        order_lines = validated_data.pop('products_data', [])
+
+        with transaction.atomic():
+            order = Order.objects.create(**validated_data)
+            OrderProduct.objects.bulk_create([
+                OrderProduct(order=order, product=product, count=count)
+                for product, count in order_lines
+            ])
 
         return order
@@ -1,13 +1,30 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, NotSupportedError, connection
+from django.http import Http404
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django_filters.compat import TestCase
 from rest_framework import status
 from rest_framework.test import APITestCase
-from .models import Category, Tag
+from authapp.models import UserProfile
+from .admin import MinuteDateTimeString
+from .lookups import get_delivery, get_payment, get_status
+from .models import Category, DeliveryType, Discount, Order, OrderStatus, PaymentType, Product, Review, Tag
+from .renderers import ORJSONRenderer
 from .serializers import CategorySerializer, TagSerializer
 
 
 class CategoryListAPIViewTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.url = reverse('category-list')
 
     def test_get_category_list(self):
@@ -17,9 +34,32 @@ class CategoryListAPIViewTest(APITestCase):
         serializer = CategorySerializer(categories, many=True)
         self.assertEqual(response.data, serializer.data)
 
+    def test_category_change_invalidates_cache(self):
+        self.client.get(self.url)
+        Category.objects.create(title='Книги', is_parent=True)
+        response = self.client.get(self.url)
+        self.assertEqual([category['title'] for category in response.data], ['Книги'])
+
+    def test_category_tree(self):
+        parent = Category.objects.create(title='Электроника', is_parent=True)
+        phones = Category.objects.create(title='Телефоны')
+        laptops = Category.objects.create(title='Ноутбуки')
+        smartphones = Category.objects.create(title='Смартфоны')
+        phones.parent.add(parent)
+        laptops.parent.add(parent)
+        smartphones.parent.add(phones)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual([category['id'] for category in response.data], [parent.id])
+        subcategories = response.data[0]['subcategories']
+        self.assertEqual([category['title'] for category in subcategories], ['Телефоны', 'Ноутбуки'])
+        self.assertEqual([category['title'] for category in subcategories[0]['subcategories']], ['Смартфоны'])
+        self.assertEqual(subcategories[1]['subcategories'], [])
+
 
 class TagsAPIViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.url = '/api/tags'
 
     def test_get_tag_list(self):
@@ -28,3 +68,390 @@ class TagsAPIViewTest(TestCase):
         tags = Tag.objects.all()
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(response.data, serializer.data)
+
+    def test_tag_list_cache_is_invalidated(self):
+        self.client.get(self.url)
+        tag = Tag.objects.create(name='Новинка')
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, [{'id': tag.id, 'name': 'Новинка'}])
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+
+class LookupCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.delivery = DeliveryType.objects.create(pk=1, name='Экспресс-доставка', price=500)
+
+    def test_cache_hit(self):
+        self.assertEqual(get_delivery(1), self.delivery)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_delivery(1).name, 'Экспресс-доставка')
+
+    def test_save_invalidates_cache(self):
+        get_delivery(1)
+        self.delivery.price = 700
+        self.delivery.save()
+        self.assertEqual(get_delivery(1).price, 700)
+
+    def test_delete_invalidates_cache(self):
+        get_delivery(1)
+        self.delivery.delete()
+        with self.assertRaises(Http404):
+            get_delivery(1)
+
+    def test_missing_lookup(self):
+        with self.assertRaises(Http404):
+            get_status(999)
+        with self.assertRaises(Http404):
+            get_payment(999)
+
+
+class ReviewProductFieldsTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Электроника')
+        self.product = Product.objects.create(title='Телефон', category=category)
+
+    def test_review_updates_product_rating(self):
+        Review.objects.create(product=self.product, author='a', text='t', rate=5)
+        Review.objects.create(product=self.product, author='b', text='t', rate=2)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 2)
+        self.assertEqual(self.product.rating, 3.5)
+
+    def test_rating_is_rounded_to_one_decimal(self):
+        for rate in (1, 2, 2):
+            Review.objects.create(product=self.product, author='a', text='t', rate=rate)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_x10, 17)
+        self.assertEqual(self.product.rating, 1.7)
+
+    def test_review_delete_updates_product_rating(self):
+        review = Review.objects.create(product=self.product, author='a', text='t', rate=5)
+        Review.objects.create(product=self.product, author='b', text='t', rate=2)
+        review.delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 1)
+        self.assertEqual(self.product.rating, 2)
+
+    def test_review_insert_updates_stats_in_one_query(self):
+        review = Review(product=self.product, author='a', text='t', rate=4)
+        with self.assertNumQueries(2):
+            review.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.reviews_count, self.product.rate_sum, self.product.rating_x10), (1, 4, 40))
+
+    def test_review_edit_recounts_stats(self):
+        review = Review.objects.create(product=self.product, author='a', text='t', rate=5)
+        Review.objects.create(product=self.product, author='b', text='t', rate=1)
+        review.rate = 2
+        review.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.reviews_count, self.product.rate_sum, self.product.rating_x10), (2, 3, 15))
+
+    def test_review_queryset_delete_updates_product_rating(self):
+        for rate in (5, 4, 1):
+            Review.objects.create(product=self.product, author='a', text='t', rate=rate)
+        Review.objects.filter(rate__gte=4).delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.reviews_count, self.product.rate_sum, self.product.rating_x10), (1, 1, 10))
+        self.product.reviews.all().delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.reviews_count, self.product.rate_sum, self.product.rating_x10), (0, 0, 0))
+
+    def test_product_delete_removes_reviews_without_per_review_updates(self):
+        for rate in (5, 4, 1):
+            Review.objects.create(product=self.product, author='a', text='t', rate=rate)
+        with CaptureQueriesContext(connection) as queries:
+            self.product.delete()
+        self.assertFalse(Review.objects.exists())
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+
+    def test_loaddata_keeps_stored_stats(self):
+        Review.objects.create(product=self.product, author='a', text='t', rate=5)
+        Review.objects.create(product=self.product, author='b', text='t', rate=3)
+        product_id = self.product.pk
+        with tempfile.TemporaryDirectory() as directory:
+            fixture = os.path.join(directory, 'product.json')
+            call_command('dumpdata', 'shopapp.Category', 'shopapp.Product', 'shopapp.Review', output=fixture)
+            self.product.delete()
+            call_command('loaddata', fixture, verbosity=0)
+        product = Product.objects.get(pk=product_id)
+        self.assertEqual((product.reviews_count, product.rate_sum, product.rating_x10), (2, 8, 40))
+
+    def test_review_rate_out_of_range_rejected(self):
+        with self.assertRaises(IntegrityError):
+            Review.objects.create(product=self.product, author='a', text='t', rate=6)
+
+
+class ReviewViewSetTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Электроника')
+        self.product = Product.objects.create(title='Телефон', category=category)
+
+    def test_create_review(self):
+        payload = {'author': 'Иван', 'email': 'ivan@example.com', 'text': 'Отлично', 'rate': 4}
+        response = self.client.post(f'/api/product/{self.product.id}/reviews', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([review['author'] for review in response.data], ['Иван'])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reviews_count, 1)
+        self.assertEqual(self.product.rating, 4)
+
+    def test_create_review_for_unknown_product(self):
+        payload = {'author': 'Иван', 'email': 'ivan@example.com', 'text': 'Отлично', 'rate': 4}
+        response = self.client.post('/api/product/999/reviews', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CatalogAPIViewTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Электроника')
+        self.product = Product.objects.create(title='Телефон', category=category, price=100)
+        Review.objects.create(product=self.product, author='a', text='t', rate=4)
+
+    def test_get_catalog(self):
+        response = self.client.get('/api/catalog')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['currentPage'], 1)
+        self.assertEqual(response.data['lastPage'], 1)
+        item = response.data['items'][0]
+        self.assertEqual(item['id'], self.product.id)
+        self.assertEqual(item['reviews'], 1)
+        self.assertEqual(item['rating'], 4)
+
+    def test_catalog_does_not_load_deferred_fields(self):
+        Product.objects.create(title='Планшет', category=self.product.category, price=200)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/catalog')
+        self.assertEqual(len(response.data['items']), 2)
+
+    def test_catalog_images(self):
+        other = Product.objects.create(title='Планшет', category=self.product.category, preview='products/tablet.png')
+        response = self.client.get('/api/catalog')
+        images = {item['id']: item['images'] for item in response.data['items']}
+        self.assertEqual(images[other.id], [{'src': '/media/products/tablet.png', 'alt': 'Preview Image'}])
+        self.assertEqual(images[self.product.id][0]['src'], '/media/Отсутствие.png')
+
+    def test_filter_catalog(self):
+        other = Product.objects.create(title='Планшет', category=self.product.category, price=200, freeDelivery=True)
+        response = self.client.get('/api/catalog', {'filter[minPrice]': 150, 'filter[freeDelivery]': 'true'})
+        self.assertEqual([item['id'] for item in response.data['items']], [other.id])
+        response = self.client.get('/api/catalog', {'filter[name]': 'Теле'})
+        self.assertEqual([item['id'] for item in response.data['items']], [self.product.id])
+
+    def test_filter_by_several_tags_returns_product_once(self):
+        tags = [Tag.objects.create(name='Новинка'), Tag.objects.create(name='Хит')]
+        self.product.tags.set(tags)
+        response = self.client.get('/api/catalog', {'tags[]': [tag.id for tag in tags]})
+        self.assertEqual([item['id'] for item in response.data['items']], [self.product.id])
+
+    def test_filter_by_unknown_tag(self):
+        tag = Tag.objects.create(name='Хит')
+        self.product.tags.add(tag)
+        response = self.client.get('/api/catalog', {'tags[]': [tag.id, 999]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['items']], [self.product.id])
+        response = self.client.get('/api/catalog', {'tags[]': [999]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['items'], [])
+
+    def test_malformed_filter_is_rejected(self):
+        response = self.client.get('/api/catalog', {'filter[minPrice]': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sort_catalog_by_rating(self):
+        other = Product.objects.create(title='Планшет', category=self.product.category, price=200)
+        Review.objects.create(product=other, author='a', text='t', rate=5)
+        response = self.client.get('/api/catalog', {'sort': 'rating', 'sortType': 'inc'})
+        self.assertEqual([item['id'] for item in response.data['items']], [other.id, self.product.id])
+
+
+class ProductQueriesTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Электроника')
+        tag = Tag.objects.create(name='Хит')
+        for title in ('Телефон', 'Планшет'):
+            product = Product.objects.create(title=title, category=category, popular=True, limited=True, banner=True)
+            product.tags.add(tag)
+            Review.objects.create(product=product, author='a', text='t', rate=5)
+        self.product = product
+
+    def test_product_lists_queries(self):
+        for url in ('/api/products/popular', '/api/products/limited', '/api/banners'):
+            with self.subTest(url=url), self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data), 2)
+
+    def test_product_details_queries(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/product/{self.product.id}')
+        self.assertEqual(response.data['reviews'][0]['rate'], 5)
+        self.assertEqual(response.data['tags'], [{'id': self.product.tags.get().id, 'name': 'Хит'}])
+
+
+class DiscountedProductsAPIViewTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Электроника')
+        for number in range(11):
+            product = Product.objects.create(title=f'Товар {number}', category=category, price=100)
+            Discount.objects.create(product=product, salePrice=80, dateFrom='2023-01-01', dateTo='2023-02-01')
+
+    def test_get_sales_pages(self):
+        response = self.client.get('/api/sales')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['items']), 10)
+        self.assertEqual(response.data['currentPage'], 1)
+        self.assertEqual(response.data['lastPage'], 2)
+        response = self.client.get('/api/sales', {'currentPage': 2})
+        self.assertEqual(len(response.data['items']), 1)
+        self.assertEqual(response.data['items'][0]['salePrice'], 80)
+
+    def test_out_of_range_page_returns_last_page(self):
+        response = self.client.get('/api/sales', {'currentPage': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['currentPage'], 2)
+
+
+class BasketAPIViewTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Электроника')
+        self.product = Product.objects.create(title='Телефон', category=category, price=100)
+        self.other_product = Product.objects.create(title='Планшет', category=category, price=200)
+        self.client.force_authenticate(User.objects.create_user(username='ivan', password='secret-pass'))
+
+    def test_add_to_basket(self):
+        self.client.post('/api/basket', {'id': self.product.id, 'count': 2}, format='json')
+        self.client.post('/api/basket', {'id': self.other_product.id, 'count': 1}, format='json')
+        response = self.client.post('/api/basket', {'id': self.product.id, 'count': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        counts = {item['id']: item['count'] for item in response.data}
+        self.assertEqual(counts, {self.product.id: 3, self.other_product.id: 1})
+
+    def test_remove_from_basket(self):
+        self.client.post('/api/basket', {'id': self.product.id, 'count': 2}, format='json')
+        response = self.client.delete('/api/basket', {'id': self.product.id, 'count': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['count'], 1)
+        response = self.client.delete('/api/basket', {'id': self.product.id, 'count': 1}, format='json')
+        self.assertEqual(response.data, [])
+
+    def test_remove_more_than_in_basket(self):
+        self.client.post('/api/basket', {'id': self.product.id, 'count': 1}, format='json')
+        response = self.client.delete('/api/basket', {'id': self.product.id, 'count': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/basket').data[0]['count'], 1)
+
+    def test_get_basket_queries(self):
+        self.client.post('/api/basket', {'id': self.product.id, 'count': 2}, format='json')
+        self.client.post('/api/basket', {'id': self.other_product.id, 'count': 1}, format='json')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/basket')
+        self.assertEqual([item['id'] for item in response.data], [self.product.id, self.other_product.id])
+        self.assertEqual([item['count'] for item in response.data], [2, 1])
+
+
+class OrderAPIViewTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Электроника')
+        self.product = Product.objects.create(title='Телефон', category=category, price=100)
+        self.other_product = Product.objects.create(title='Планшет', category=category, price=200)
+        DeliveryType.objects.create(pk=3, name='Обычная доставка')
+        PaymentType.objects.create(pk=3, name='Онлайн')
+        OrderStatus.objects.create(pk=7, name='Создан')
+        self.client.force_authenticate(User.objects.create_user(username='ivan', password='secret-pass'))
+        self.client.post('/api/basket', {'id': self.product.id, 'count': 2}, format='json')
+
+    def test_create_order(self):
+        payload = [{'id': self.product.id, 'count': 2}, {'id': self.other_product.id, 'count': 1}]
+        response = self.client.post('/api/orders', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=response.data['orderId'])
+        counts = dict(order.orderproduct_set.values_list('product_id', 'count'))
+        self.assertEqual(counts, {self.product.id: 2, self.other_product.id: 1})
+        self.assertEqual(self.client.get('/api/basket').data, [])
+
+    def test_list_orders(self):
+        user = User.objects.get(username='ivan')
+        UserProfile.objects.filter(user=user).update(fullName='Иван Петров', city='Москва')
+        for _ in range(2):
+            self.client.post('/api/orders', [{'id': self.product.id, 'count': 1}], format='json')
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/orders')
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(response.data[0]['fullName'], 'Иван Петров')
+        self.assertEqual(response.data[0]['city'], 'Москва')
+        self.assertIsNone(response.data[0]['phone'])
+
+    def test_create_order_sums_duplicate_products(self):
+        payload = [{'id': self.product.id, 'count': 2}, {'id': self.product.id, 'count': 3}]
+        response = self.client.post('/api/orders', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=response.data['orderId'])
+        self.assertEqual(list(order.orderproduct_set.values_list('product_id', 'count')), [(self.product.id, 5)])
+
+    def test_create_order_with_unknown_product(self):
+        response = self.client.post('/api/orders', [{'id': 999, 'count': 1}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'products_data': ['Invalid product ID']})
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_order_without_cart(self):
+        self.client.force_authenticate(User.objects.create_user(username='petr', password='secret-pass'))
+        response = self.client.post('/api/orders', [{'id': self.product.id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=response.data['orderId'])
+        self.assertEqual(list(order.orderproduct_set.values_list('product_id', 'count')), [(self.product.id, 1)])
+
+    def test_create_order_with_invalid_count(self):
+        for count in (0, -1):
+            with self.subTest(count=count):
+                response = self.client.post('/api/orders', [{'id': self.product.id, 'count': count}], format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_order_with_malformed_payload(self):
+        response = self.client.post('/api/orders', [{'count': 1}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_confirm_order_computes_total_cost(self):
+        DeliveryType.objects.create(pk=1, name='Экспресс-доставка', price=500)
+        PaymentType.objects.create(pk=1, name='Онлайн с карты')
+        OrderStatus.objects.create(pk=1, name='Подтвержден')
+        payload = [{'id': self.product.id, 'count': 2}, {'id': self.other_product.id, 'count': 1}]
+        order_id = self.client.post('/api/orders', payload, format='json').data['orderId']
+        response = self.client.post(f'/api/order/{order_id}', {'deliveryType': 'express'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(pk=order_id)
+        self.assertEqual(order.totalCost, 900)
+        self.assertEqual(order.deliveryType_id, 1)
+        self.assertEqual(order.status_id, 1)
+
+
+class ORJSONRendererTest(TestCase):
+    def test_render(self):
+        data = {'title': 'Телефон', 'price': Decimal('99.90'), 1: None}
+        self.assertEqual(ORJSONRenderer().render(data), '{"title":"Телефон","price":99.9,"1":null}'.encode())
+
+    def test_render_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class OrderAdminTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(username='admin', password='secret-pass')
+        self.client.force_login(self.user)
+
+    def test_changelist_shows_created_at_to_the_minute(self):
+        created_at = datetime(2023, 5, 1, 14, 30, 45, tzinfo=timezone.utc)
+        Order.objects.create(user=self.user, createdAt=created_at)
+        response = self.client.get(reverse('admin:shopapp_order_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<td class="field-created_str">2023-05-01 14:30</td>', html=True)
+
+    def test_unsupported_backend(self):
+        expression = MinuteDateTimeString('createdAt')
+        connection = mock.Mock(vendor='oracle')
+        with self.assertRaises(NotSupportedError):
+            expression.as_sql(mock.Mock(), connection)
@@ -4,20 +4,53 @@
 конкретный тип запроса (GET, POST, etc.) и какие данные будут возвращены в ответе.
 """
 
-from django.core.paginator import Paginator
-from django.shortcuts import get_object_or_404
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework import generics, status, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Category, Product, Tag, Review, Discount, Order, OrderStatus, PaymentType, DeliveryType
-from .serializers import CategorySerializer, CatalogResponseSerializer, TagSerializer, ProductSerializer, \
-    ProductDetailsSerializer, ReviewSerializer, DiscountSerializer, SaleResponseSerializer, CartItemSerializer, \
+from django_filters.rest_framework import DjangoFilterBackend
+from .filters import CatalogOrderingFilter, ProductFilter
+from .lookups import get_delivery, get_payment, get_status
+from .pagination import CurrentPagePagination
+from .models import CATEGORIES_CACHE_KEY, TAGS_CACHE_KEY, Category, Product, Tag, Review, Discount, Order, OrderProduct
+from .serializers import CategorySerializer, TagSerializer, ProductSerializer, \
+    ProductDetailsSerializer, ReviewSerializer, DiscountSerializer, CartItemSerializer, \
     CartGETSerializer, OrderSerializer
-from rest_framework.filters import OrderingFilter
-from django.db.models import Avg, Q
+from django.db.models import Case, CharField, F, Prefetch, Q, Sum, Value, When
+from django.db.models.functions import Concat
 from authapp.models import Cart, CartItem
 
 
+CATEGORIES_CACHE_TIMEOUT = 60 * 5
+TAGS_CACHE_TIMEOUT = 60 * 5
+
+PRODUCT_LIST_FIELDS = (
+    'id', 'category_id', 'price', 'count', 'date', 'title', 'description', 'freeDelivery',
+    'reviews_count', 'rating_x10',
+)
+
+
+def preview_path(field='preview'):
+    """
+    Возвращает выражение с путем к превью продукта или NULL, если превью не загружено.
+    """
+    return Case(
+        When(Q(**{f'{field}__isnull': True}) | Q(**{field: ''}), then=Value(None)),
+        default=Concat(Value('/media/'), field),
+        output_field=CharField(),
+    )
+
+
+def product_list_queryset():
+    """
+    Возвращает queryset продуктов для списков: только выводимые поля, путь к превью и теги.
+    """
+    return Product.objects.only(*PRODUCT_LIST_FIELDS).annotate(preview_path=preview_path()).prefetch_related('tags')
+
+
 class CategoryListAPIView(generics.ListAPIView):
     """
     Класс представления для получения списка категорий.
@@ -32,6 +65,34 @@ class CategoryListAPIView(generics.ListAPIView):
         """
         return Category.objects.filter(is_parent=True)
 
+    def get_serializer_context(self):
+        """
+        Добавляет в контекст сериализатора дочерние категории, сгруппированные по родителю.
+
+        Все категории и связи между ними загружаются двумя запросами, чтобы сериализатор
+        не обращался к базе данных на каждом уровне дерева.
+        """
+        context = super().get_serializer_context()
+        categories = Category.objects.in_bulk()
+        children_by_parent = defaultdict(list)
+        links = Category.parent.through.objects.order_by('from_category_id').values_list(
+            'from_category_id', 'to_category_id',
+        )
+        for child_id, parent_id in links:
+            children_by_parent[parent_id].append(categories[child_id])
+        context['children_by_parent'] = children_by_parent
+        return context
+
+    def list(self, request, *args, **kwargs):
+        """
+        Возвращает дерево категорий из кэша, сериализуя его только при отсутствии в кэше.
+        """
+        data = cache.get(CATEGORIES_CACHE_KEY)
+        if data is None:
+            data = self.get_serializer(self.get_queryset(), many=True).data
+            cache.set(CATEGORIES_CACHE_KEY, data, CATEGORIES_CACHE_TIMEOUT)
+        return Response(data)
+
 
 class TagsAPIView(generics.ListAPIView):
     """
@@ -42,6 +103,16 @@ class TagsAPIView(generics.ListAPIView):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
+    def list(self, request, *args, **kwargs):
+        """
+        Возвращает список тегов из кэша, сериализуя его только при отсутствии в кэше.
+        """
+        data = cache.get(TAGS_CACHE_KEY)
+        if data is None:
+            data = self.get_serializer(self.get_queryset(), many=True).data
+            cache.set(TAGS_CACHE_KEY, data, TAGS_CACHE_TIMEOUT)
+        return Response(data)
+
 
 class ProductAPIView(generics.RetrieveAPIView):
     """
@@ -49,7 +120,11 @@ class ProductAPIView(generics.RetrieveAPIView):
 
     Сериализует и возвращает информацию о продукте с заданным идентификатором.
     """
-    queryset = Product.objects.all()
+    queryset = Product.objects.prefetch_related(
+        Prefetch('reviews', queryset=Review.objects.only('product_id', *ReviewSerializer.Meta.fields)),
+        'specifications',
+        'tags',
+    )
     serializer_class = ProductDetailsSerializer
     lookup_field = 'pk'
 
@@ -76,80 +151,18 @@ class CatalogAPIView(generics.ListAPIView):
     Сериализует и возвращает список продуктов с возможностью фильтрации, сортировки и пагинации.
     """
 
-    filter_backends = [OrderingFilter]
-    serializer_class = CatalogResponseSerializer
-
-    def filter_queryset(self, queryset):
-        """
-        Фильтрует и сортирует список продуктов согласно параметрам запроса.
-        """
-        name_param = self.request.GET.get('filter[name]')
-        min_price_param = self.request.GET.get('filter[minPrice]')
-        max_price_param = self.request.GET.get('filter[maxPrice]')
-        freeDelivery_param = self.request.GET.get('filter[freeDelivery]')
-        available_param = self.request.GET.get('filter[available]')
-        sort_param = self.request.GET.get('sort')
-        sort_type_param = self.request.GET.get('sortType')
-        tags_param = self.request.GET.getlist('tags[]')
-
-        if name_param:
-            queryset = queryset.filter(title__icontains=name_param)
-        if min_price_param:
-            queryset = queryset.filter(price__gte=min_price_param)
-        if max_price_param:
-            queryset = queryset.filter(price__lte=max_price_param)
-        if freeDelivery_param is not None:
-            freeDelivery = freeDelivery_param.lower() == 'false'
-            if freeDelivery:
-                queryset = queryset.filter(
-                    Q(freeDelivery=True) | Q(freeDelivery=False) | Q(freeDelivery__isnull=True))
-            else:
-                queryset = queryset.filter(Q(freeDelivery=True) | Q(freeDelivery__isnull=True))
-        if available_param:
-            queryset = queryset.filter(available=available_param.lower() == 'true')
-        if tags_param:
-            queryset = queryset.filter(tags__in=tags_param)
-
-        if sort_param:
-            sort_fields = [sort_field.strip() for sort_field in sort_param.split(',')]
-            sort_types = [sort_type.strip() for sort_type in sort_type_param.split(',')]
-            ordering = []
-
-            for field, sort_type in zip(sort_fields, sort_types):
-                if sort_type == 'dec':
-                    ordering.append(field)
-                elif sort_type == 'inc':
-                    ordering.append('-' + field)
-
-            queryset = queryset.order_by(*ordering)
-
-        return queryset
+    filter_backends = [DjangoFilterBackend, CatalogOrderingFilter]
+    filterset_class = ProductFilter
+    pagination_class = CurrentPagePagination
+    serializer_class = ProductSerializer
 
     def get_queryset(self):
         """
         Возвращает queryset, содержащий список продуктов.
         """
-        queryset = Product.objects.all()
+        queryset = product_list_queryset().order_by('id')
         return queryset
 
-    def get(self, request, *args, **kwargs):
-        """
-        Возвращает список продуктов в каталоге.
-        """
-        queryset = self.filter_queryset(self.get_queryset())
-
-        paginator = Paginator(queryset, 10)
-        page_number = request.GET.get('currentPage')
-        page_obj = paginator.get_page(page_number)
-
-        serializer = ProductSerializer(page_obj, many=True)
-        data = {
-            'items': serializer.data,
-            'currentPage': page_obj.number,
-            'lastPage': paginator.num_pages,
-        }
-        return Response(data, status=status.HTTP_200_OK)
-
 
 class ReviewViewSet(viewsets.ViewSet):
     """
@@ -166,15 +179,13 @@ class ReviewViewSet(viewsets.ViewSet):
         Возвращает:
         - Response: Ответ, содержащий созданный отзыв и связанную информацию.
         """
-        try:
-            product = Product.objects.get(pk=pk)
-        except Product.DoesNotExist:
+        if not Product.objects.filter(pk=pk).exists():
             return Response({'error': 'Продукт не найден.'}, status=status.HTTP_404_NOT_FOUND)
 
         serializer = ReviewSerializer(data=request.data)
         if serializer.is_valid():
             review = Review(
-                product=product,
+                product_id=pk,
                 author=serializer.validated_data['author'],
                 text=serializer.validated_data['text'],
                 rate=serializer.validated_data['rate'],
@@ -182,11 +193,7 @@ class ReviewViewSet(viewsets.ViewSet):
             )
             review.save()
 
-            product.reviews_count = product.reviews.count()
-            product.rating = product.reviews.aggregate(avg_rating=Avg('rate')).get('avg_rating')
-            product.save()
-
-            reviews = product.reviews.all()
+            reviews = Review.objects.filter(product_id=pk).only(*ReviewSerializer.Meta.fields)
             reviews_serializer = ReviewSerializer(reviews, many=True)
 
             return Response(reviews_serializer.data, status=status.HTTP_201_CREATED)
@@ -199,7 +206,7 @@ class PopularProductsAPIView(generics.ListAPIView):
     Представление для получения популярных продуктов.
     """
 
-    queryset = Product.objects.filter(popular=True)
+    queryset = product_list_queryset().filter(popular=True)
     serializer_class = ProductSerializer
 
 
@@ -208,7 +215,7 @@ class LimitedProductsAPIView(generics.ListAPIView):
     Представление для получения ограниченных продуктов.
     """
 
-    queryset = Product.objects.filter(limited=True)
+    queryset = product_list_queryset().filter(limited=True)
     serializer_class = ProductSerializer
 
 
@@ -217,7 +224,7 @@ class BannersAPIView(generics.ListAPIView):
     Представление для получения продуктов-баннеров.
     """
 
-    queryset = Product.objects.filter(banner=True)[:3]
+    queryset = product_list_queryset().filter(banner=True)[:3]
     serializer_class = ProductSerializer
 
 
@@ -226,32 +233,11 @@ class DiscountedProductsAPIView(generics.ListAPIView):
     Представление для получения продуктов со скидкой с пагинацией.
     """
 
-    serializer_class = SaleResponseSerializer
-    queryset = Discount.objects.all()
-
-    def get(self, request, *args, **kwargs):
-        """
-        Получает список продуктов со скидкой с пагинацией.
-
-        Параметры:
-        - request: Объект запроса.
-        - args: Дополнительные аргументы.
-        - kwargs: Дополнительные именованные аргументы.
-
-        Возвращает:
-        - Response: Ответ, содержащий список продуктов со скидкой с пагинацией.
-        """
-        paginator = Paginator(self.queryset.order_by('product'), 10)
-        page_number = request.GET.get('currentPage')
-        page_obj = paginator.get_page(page_number)
-
-        serializer = DiscountSerializer(page_obj, many=True)
-        data = {
-            'items': serializer.data,
-            'currentPage': page_obj.number,
-            'lastPage': paginator.num_pages,
-        }
-        return Response(data, status=status.HTTP_200_OK)
+    serializer_class = DiscountSerializer
+    pagination_class = CurrentPagePagination
+    queryset = Discount.objects.select_related('product').only(
+        'salePrice', 'dateFrom', 'dateTo', 'product__title', 'product__price',
+    ).annotate(preview_path=preview_path('product__preview')).order_by('product')
 
 
 class BasketAPIView(APIView):
@@ -259,16 +245,24 @@ class BasketAPIView(APIView):
     Класс представления для работы с корзиной пользователя.
     """
 
+    @staticmethod
+    def serialize_cart(cart_id):
+        """
+        Сериализует товары корзины вместе с их количеством.
+
+        Товары выбираются вместе с количеством из корзины одним запросом, сама корзина не загружается.
+        """
+        products = product_list_queryset().filter(cartitem__cart_id=cart_id).annotate(
+            cart_count=F('cartitem__count'),
+        ).order_by('cartitem__id')
+        serializer = CartGETSerializer(products, many=True)
+        return serializer.data
+
     def get(self, request):
         """
         Возвращает корзину пользователя.
         """
-        user = request.user
-        cart = Cart.objects.get(user=user)
-        items = cart.items.all()
-        products = [item.product for item in items]
-        serializer = CartGETSerializer(products, many=True, context={'cart': cart})
-        return Response(serializer.data)
+        return Response(self.serialize_cart(request.user.pk))
 
     def post(self, request):
         """
@@ -279,25 +273,18 @@ class BasketAPIView(APIView):
             product_id = serializer.validated_data['id']
             count = serializer.validated_data['count']
 
-            try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
+            if not Product.objects.filter(id=product_id).exists():
                 return Response({'error': 'Invalid product ID'}, status=status.HTTP_400_BAD_REQUEST)
 
             user = request.user
             cart, created = Cart.objects.get_or_create(user=user)
 
-            try:
-                item = cart.items.get(product=product)
-                item.count += count
-                item.save()
-            except CartItem.DoesNotExist:
-                item = CartItem.objects.create(cart=cart, product=product, count=count)
+            with transaction.atomic():
+                updated = cart.items.filter(product_id=product_id).update(count=F('count') + count)
+                if not updated:
+                    CartItem.objects.create(cart=cart, product_id=product_id, count=count)
 
-            items = cart.items.all()
-            products = [item.product for item in items]
-            serializer = CartGETSerializer(products, many=True, context={'cart': cart})
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(self.serialize_cart(cart.pk), status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -309,32 +296,23 @@ class BasketAPIView(APIView):
         try:
             cart = Cart.objects.get(user=user)
             product_id = request.data.get('id')
-            count = request.data.get('count', 1)
+            count = int(request.data.get('count', 1))
 
             if product_id is None:
                 return Response({'error': 'Product ID is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
+            if not Product.objects.filter(id=product_id).exists():
                 return Response({'error': 'Product not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-            cart_item = cart.items.filter(product=product).first()
-
-            if cart_item:
-                new_count = cart_item.count - int(count)
-                if new_count < 0:
-                    return Response({'error': 'Count cannot be negative.'}, status=status.HTTP_400_BAD_REQUEST)
-                elif new_count == 0:
-                    cart_item.delete()
-                else:
-                    cart_item.count = new_count
-                    cart_item.save()
-
-            items = cart.items.all()
-            products = [item.product for item in items]
-            serializer = CartGETSerializer(products, many=True, context={'cart': cart})
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            items = cart.items.filter(product_id=product_id)
+
+            with transaction.atomic():
+                if not items.filter(count__gt=count).update(count=F('count') - count):
+                    deleted, _ = items.filter(count=count).delete()
+                    if not deleted and items.exists():
+                        return Response({'error': 'Count cannot be negative.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response(self.serialize_cart(cart.pk), status=status.HTTP_200_OK)
         except Cart.DoesNotExist:
             return Response({'error': 'Cart not found.'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -351,7 +329,9 @@ class OrderAPIView(APIView):
         Возвращает:
         - Response: Ответ с данными о заказах.
         """
-        orders = Order.objects.all()
+        orders = Order.objects.select_related(
+            'user__profile', 'deliveryType', 'paymentType', 'status',
+        ).prefetch_related(Prefetch('products', queryset=product_list_queryset()))
         serializer = OrderSerializer(orders, many=True)
         return Response(serializer.data)
 
@@ -365,28 +345,22 @@ class OrderAPIView(APIView):
         Возвращает:
         - Response: Ответ с данными о созданном заказе.
         """
-        products = request.data
-
-        order = Order.objects.create(user=request.user)
-
-        for product_data in products:
-            product = Product.objects.get(id=product_data['id'])
-
-            order.products.add(product)
+        serializer = OrderSerializer(data={'products_data': request.data})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        order.deliveryType = get_object_or_404(DeliveryType, id=3)
-        order.paymentType = get_object_or_404(PaymentType, id=3)
-        order.status = get_object_or_404(OrderStatus, id=7)
-        order.save()
+        with transaction.atomic():
+            order = serializer.save(
+                user=request.user,
+                deliveryType=get_delivery(3),
+                paymentType=get_payment(3),
+                status=get_status(7),
+            )
+            CartItem.objects.filter(cart_id=request.user.pk).delete()
 
-        serializer = OrderSerializer(order)
         data = serializer.data
         data['orderId'] = order.id
 
-        user = request.user
-        cart = user.cart
-        cart.items.all().delete()
-
         return Response(data, status=status.HTTP_201_CREATED)
 
 
@@ -407,7 +381,9 @@ class OrderDetailView(generics.RetrieveAPIView):
         - Response: Ответ с данными о заказе.
         """
         try:
-            order = Order.objects.get(pk=pk)
+            order = Order.objects.select_related(
+                'user__profile', 'deliveryType', 'paymentType', 'status',
+            ).prefetch_related(Prefetch('products', queryset=product_list_queryset())).get(pk=pk)
             serializer = OrderSerializer(order)
             return Response(serializer.data)
         except Order.DoesNotExist:
@@ -427,30 +403,24 @@ class OrderDetailView(generics.RetrieveAPIView):
         payload_data = request.data
         try:
             order = Order.objects.get(pk=pk)
-            total_cost = 0
-            products = payload_data.get('products', [])
-            for product_data in products:
-                price = product_data.get('price', 0)
-                count = product_data.get('count', 0)
-                total_cost += price * count
 
             if payload_data.get('deliveryType') == 'express':
-                delivery_type = DeliveryType.objects.get(pk=1)
-                order.deliveryType = delivery_type
-                total_cost += delivery_type.price
+                order.deliveryType = get_delivery(1)
             else:
-                delivery_type = DeliveryType.objects.get(pk=2)
-                order.deliveryType = delivery_type
-                total_cost += delivery_type.price
+                order.deliveryType = get_delivery(2)
 
             if payload_data.get('paymentType') == 'someone':
-                order.paymentType = PaymentType.objects.get(pk=2)
+                order.paymentType = get_payment(2)
             else:
-                order.paymentType = PaymentType.objects.get(pk=1)
+                order.paymentType = get_payment(1)
+
+            products_cost = OrderProduct.objects.filter(order=order).aggregate(
+                total=Sum(F('product__price') * F('count')),
+            )['total'] or 0
 
-            order.status = OrderStatus.objects.get(pk=1)
-            order.totalCost = total_cost
-            order.save()
+            order.status = get_status(1)
+            order.totalCost = products_cost + order.deliveryType.price
+            order.save(update_fields=['totalCost', 'deliveryType', 'paymentType', 'status'])
 
             request.session['orderId'] = order.id
 
@@ -500,7 +470,7 @@ class PaymentView(generics.RetrieveAPIView):
         if order_id:
             try:
                 order = Order.objects.get(pk=order_id)
-                order.status = OrderStatus.objects.get(pk=3)
+                order.status = get_status(3)
                 order.save()
                 return Response({'message': 'Статус заказа успешно обновлен.'})
             except Order.DoesNotExist: